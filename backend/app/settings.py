@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str = ""
     GROQ_API_KEY: str = ""
     ELEVENLABS_API_KEY: str = ""
+    ELEVENLABS_MODEL_ID: str = "eleven_flash_v2_5"  # Use eleven_multilingual_v2 for quality-critical runs
 
 
     # iDrive E2 Storage
@@ -51,9 +52,15 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
 
+    # Provider rate limits (Redis token buckets shared across workers, 0 = unlimited)
+    RATE_LIMIT_REDIS_DB: int = 2
+    EMBEDDING_RATE_LIMIT_RPM: int = 0
+    EMBEDDING_RATE_LIMIT_TPM: int = 0
+
     # Celery Configuration
     CELERY_BROKER_URL: str = ""  # Will be set from REDIS_HOST/PORT
     CELERY_RESULT_BACKEND: str = ""  # Will be set from REDIS_HOST/PORT
+    INGESTION_WORKER_CONCURRENCY: int = 2  # Total docs-queue worker threads/processes (sizes document batches)
 
     # Keycloak Authentication
     KEYCLOAK_SERVER_URL: str = "http://localhost:8080"
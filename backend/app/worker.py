@@ -1,6 +1,23 @@
 """
 Celery Worker Configuration
 Handles background task processing for document ingestion
+
+Ingestion tasks are long-tailed (seconds for a PDF, minutes for a video), so
+workers must use fair scheduling: tasks are only handed to idle processes and
+a long video never blocks short documents queued behind it. This relies on
+task_acks_late=True + worker_prefetch_multiplier=1 below, and workers should
+be started with -Ofair and must consume both queues (as the Dockerfile does):
+
+    celery -A app.worker.celery_app worker -Ofair -Q docs,youtube --loglevel=info
+
+Tasks are split across two queues with different resource profiles:
+- docs: document ingestion (CPU/embedding-bound)
+- youtube: YouTube downloads + ingestion (network-bound, long wall time)
+
+Run a pool per queue so neither starves the other, e.g.:
+
+    celery -A app.worker.celery_app worker -Ofair -Q docs -c 8
+    celery -A app.worker.celery_app worker -Ofair -Q youtube -c 2
 """
 from celery import Celery
 from app.settings import settings
@@ -28,16 +45,17 @@ import tasks.ingestion_tasks  # noqa: E402, F401
 
 # Celery configuration
 celery_app.conf.update(
-    task_serializer="json",
+    task_serializer="msgpack",  # Compact binary task bodies (payloads carry only IDs/file keys)
     result_serializer="json",
-    accept_content=["json"],
+    accept_content=["msgpack", "json"],
+    task_default_queue="docs",  # Unrouted tasks go to the document queue
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max per task
     task_soft_time_limit=3000,  # 50 minutes soft limit
     task_acks_late=True,  # Acknowledge after task completes
-    worker_prefetch_multiplier=1,  # Fetch one task at a time
-    worker_max_tasks_per_child=1,  # Restart worker after each task to clean up threads
+    worker_prefetch_multiplier=1,  # Fetch one task at a time (fair scheduling, see module docstring)
+    worker_max_tasks_per_child=100,  # Recycle prefork children periodically; shared clients persist between tasks
     worker_pool_restarts=True,  # Enable pool restarts
 )
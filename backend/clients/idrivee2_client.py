@@ -190,6 +190,34 @@ class IDriveE2Client:
             logger.error(f"❌ Failed to download file {object_name}: {str(e)}")
             raise Exception(f"Failed to download file: {str(e)}")
 
+    def download_file_sync(self, object_name: str) -> bytes:
+        """
+        Download a file from iDrive E2 storage (sync) without threading
+
+        Args:
+            object_name: S3 object name (key) in the bucket
+
+        Returns:
+            bytes: File content as bytes
+
+        Raises:
+            Exception: If download fails
+        """
+        try:
+            # Use get_object instead of download_fileobj to avoid TransferManager threading
+            response = self.sync_client.get_object(
+                Bucket=self.bucket_name,
+                Key=object_name
+            )
+            file_content = response['Body'].read()
+
+            logger.info(f"✅ File downloaded successfully (sync): {object_name}")
+            return file_content
+
+        except ClientError as e:
+            logger.error(f"❌ Failed to download file {object_name}: {str(e)}")
+            raise Exception(f"Failed to download file: {str(e)}")
+
     async def delete_file(self, object_name: str) -> bool:
         """
         Delete a file from iDrive E2 storage (async)
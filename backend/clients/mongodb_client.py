@@ -15,6 +15,16 @@ from app.logger import logger
 class MongoDBClient:
     """Client for MongoDB operations"""
 
+    # Shared by the sync and async clients. minPoolSize keeps warm sockets so the
+    # first request after idle skips the TCP/TLS handshake; the timeouts fail fast
+    # instead of hanging a request when the cluster or pool is unavailable.
+    POOL_OPTIONS = {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "serverSelectionTimeoutMS": 3000,
+        "waitQueueTimeoutMS": 2000,
+    }
+
     def __init__(self):
         """Initialize MongoDB client"""
         self.connection_string =  settings.MONGODB_URL
@@ -24,11 +34,11 @@ class MongoDBClient:
             raise ValueError("MongoDB connection string not configured")
 
         # Sync client for non-async operations
-        self.sync_client = MongoClient(self.connection_string)
+        self.sync_client = MongoClient(self.connection_string, **self.POOL_OPTIONS)
         self.sync_db = self.sync_client[self.database_name]
 
         # Async client for async operations
-        self.async_client = AsyncIOMotorClient(self.connection_string)
+        self.async_client = AsyncIOMotorClient(self.connection_string, **self.POOL_OPTIONS)
         self.async_db = self.async_client[self.database_name]
 
         # Test connection
@@ -101,32 +111,44 @@ class MongoDBClient:
         logger.info(f"✅ Document inserted into {collection}: {result.inserted_id}")
         return str(result.inserted_id)
 
-    def find_document(self, collection: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def find_document(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Find a single document in MongoDB collection
 
         Args:
             collection: Collection name
             query: Query filter
+            projection: Optional projection to include/exclude fields (e.g., {"file_key": 1})
 
         Returns:
             Optional[Dict[str, Any]]: Document if found, None otherwise
         """
-        document = self.sync_db[collection].find_one(query)
+        document = self.sync_db[collection].find_one(query, projection)
         return document
 
-    async def async_find_document(self, collection: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def async_find_document(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Async find a single document in MongoDB collection
 
         Args:
             collection: Collection name
             query: Query filter
+            projection: Optional projection to include/exclude fields (e.g., {"file_key": 1})
 
         Returns:
             Optional[Dict[str, Any]]: Document if found, None otherwise
         """
-        document = await self.async_db[collection].find_one(query)
+        document = await self.async_db[collection].find_one(query, projection)
         return document
 
     def find_documents(
@@ -233,6 +255,33 @@ class MongoDBClient:
         logger.info(f"✅ Updated {result.modified_count} document(s) in {collection}")
         return result.modified_count
 
+    async def async_upsert_document(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        set_on_insert: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Async insert or update a single document in one round-trip
+
+        Args:
+            collection: Collection name
+            query: Query filter identifying the document
+            update: Fields to set on every write
+            set_on_insert: Optional fields to set only when a new document is inserted
+
+        Returns:
+            Optional[str]: Inserted document ID, or None if an existing document was updated
+        """
+        operations = {"$set": update}
+        if set_on_insert:
+            operations["$setOnInsert"] = set_on_insert
+
+        result = await self.async_db[collection].update_one(query, operations, upsert=True)
+        logger.info(f"✅ Upserted document in {collection}")
+        return str(result.upserted_id) if result.upserted_id is not None else None
+
     def delete_document(self, collection: str, query: Dict[str, Any]) -> int:
         """
         Delete a document from MongoDB collection
@@ -263,6 +312,21 @@ class MongoDBClient:
         logger.info(f"✅ Deleted {result.deleted_count} document(s) from {collection}")
         return result.deleted_count
 
+    async def async_delete_documents(self, collection: str, query: Dict[str, Any]) -> int:
+        """
+        Async delete multiple documents from MongoDB collection
+
+        Args:
+            collection: Collection name
+            query: Query filter
+
+        Returns:
+            int: Number of documents deleted
+        """
+        result = await self.async_db[collection].delete_many(query)
+        logger.info(f"✅ Deleted {result.deleted_count} document(s) from {collection}")
+        return result.deleted_count
+
     def count_documents(self, collection: str, query: Dict[str, Any]) -> int:
         """
         Count documents in MongoDB collection
@@ -313,6 +313,48 @@ Text:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise Exception(f"Similarity search failed: {str(e)}")
 
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Search for similar documents with relevance scores using a precomputed query embedding
+
+        Args:
+            embedding: Query embedding (text-embedding-3-small)
+            k: Number of results to return
+            filter: Optional metadata filter
+            namespace: Optional namespace for multi-tenancy
+
+        Returns:
+            List[tuple]: List of (Document, score) tuples
+
+        Raises:
+            Exception: If search fails
+        """
+        try:
+            # Ensure k is a valid integer
+            if k is None or k < 1:
+                k = 5
+                logger.warning(f"Invalid k value, using default: {k}")
+
+            results = self.vector_store.similarity_search_by_vector_with_score(
+                embedding,
+                k=k,
+                filter=filter,
+                namespace=namespace
+            )
+
+            logger.info(f"✅ Found {len(results)} similar documents with scores (namespace: {namespace or 'default'})")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Similarity search by vector failed: {str(e)}")
+            raise Exception(f"Similarity search failed: {str(e)}")
+
     def delete_documents(
         self,
         ids: Optional[List[str]] = None,
@@ -0,0 +1,157 @@
+"""
+Provider Rate Limiter
+Redis-backed token buckets shared by every Celery worker, so the ceiling is the
+provider's real RPM/TPM quota instead of a per-worker task count
+"""
+
+import time
+from typing import Optional
+import redis
+from app.settings import settings
+from app.logger import logger
+
+
+# Atomic refill-and-take. Returns 0 when the cost was taken, otherwise the
+# number of milliseconds to wait before enough tokens are available.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now_ms
+tokens = math.min(capacity, tokens + (now_ms - ts) * refill_per_ms)
+local wait_ms = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait_ms = math.ceil((cost - tokens) / refill_per_ms)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_per_ms) + 1000)
+return wait_ms
+"""
+
+
+class RedisTokenBucket:
+    """Distributed token bucket refilled continuously at capacity per minute"""
+
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(self, redis_client: redis.Redis, name: str, capacity_per_minute: int):
+        """
+        Initialize token bucket
+
+        Args:
+            redis_client: Redis connection shared by all buckets
+            name: Bucket name (part of the Redis key)
+            capacity_per_minute: Burst size and refill rate per minute
+        """
+        self.key = f"{self.KEY_PREFIX}:{name}"
+        self.capacity = capacity_per_minute
+        self.refill_per_ms = capacity_per_minute / 60000
+        self._script = redis_client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, cost: int = 1) -> float:
+        """
+        Block until `cost` tokens are taken from the bucket
+
+        Args:
+            cost: Tokens to take (clamped to capacity so oversized requests still pass)
+
+        Returns:
+            Seconds spent waiting
+        """
+        cost = min(max(cost, 1), self.capacity)
+        waited = 0.0
+        while True:
+            wait_ms = int(self._script(keys=[self.key], args=[self.capacity, self.refill_per_ms, cost]))
+            if wait_ms <= 0:
+                return waited
+            time.sleep(wait_ms / 1000)
+            waited += wait_ms / 1000
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider"""
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        """
+        Initialize provider limiter
+
+        Args:
+            name: Provider name (e.g. "openai-embeddings")
+            rpm: Requests per minute quota (0 = unlimited)
+            tpm: Tokens per minute quota (0 = unlimited)
+        """
+        self.name = name
+        self.requests: Optional[RedisTokenBucket] = None
+        self.tokens: Optional[RedisTokenBucket] = None
+
+        if rpm <= 0 and tpm <= 0:
+            logger.info(f"ℹ️ Rate limiting disabled for {name}")
+            return
+
+        try:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                password=settings.REDIS_PASSWORD or None,
+                db=settings.RATE_LIMIT_REDIS_DB
+            )
+            if rpm > 0:
+                self.requests = RedisTokenBucket(client, f"{name}:rpm", rpm)
+            if tpm > 0:
+                self.tokens = RedisTokenBucket(client, f"{name}:tpm", tpm)
+            logger.info(f"✅ Rate limiter ready for {name}: {rpm or 'unlimited'} RPM, {tpm or 'unlimited'} TPM")
+        except Exception as e:
+            logger.warning(f"⚠️ Rate limiter unavailable for {name}, calls will not be throttled: {str(e)}")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any quota is enforced (callers can skip estimating tokens otherwise)"""
+        return self.requests is not None or self.tokens is not None
+
+    def acquire(self, tokens: int = 0, requests: int = 1) -> None:
+        """
+        Block until the provider quota allows the call (fails open if Redis is down)
+
+        Args:
+            tokens: Estimated tokens consumed by the call
+            requests: Number of API requests the call makes
+        """
+        if not self.enabled:
+            return
+        try:
+            waited = 0.0
+            if self.requests is not None:
+                waited += self.requests.acquire(requests)
+            if tokens and self.tokens is not None:
+                waited += self.tokens.acquire(tokens)
+            if waited:
+                logger.info(f"⏳ Throttled {self.name} for {waited:.1f}s ({tokens} tokens)")
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Rate limiter error for {self.name}, continuing unthrottled: {str(e)}")
+
+
+# Singleton instance
+_embedding_rate_limiter: Optional[ProviderRateLimiter] = None
+
+
+def get_embedding_rate_limiter() -> ProviderRateLimiter:
+    """
+    Get or create the embedding provider rate limiter singleton
+
+    Returns:
+        ProviderRateLimiter: Limiter sized to the embedding plan
+    """
+    global _embedding_rate_limiter
+    if _embedding_rate_limiter is None:
+        _embedding_rate_limiter = ProviderRateLimiter(
+            name="openai-embeddings",
+            rpm=settings.EMBEDDING_RATE_LIMIT_RPM,
+            tpm=settings.EMBEDDING_RATE_LIMIT_TPM
+        )
+    return _embedding_rate_limiter
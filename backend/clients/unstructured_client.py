@@ -1,6 +1,6 @@
 """
 Unstructured API Client for complex document extraction
-Fresh instance per task for Celery compatibility
+One instance per IngestionService (shared per Celery worker, closed on worker shutdown)
 """
 
 import os
@@ -16,4 +16,21 @@ class PodcastScript(BaseModel):
     segments: List[PodcastSegment] = Field(description="Ordered list of dialogue segments")
 
 
+class PodcastDocumentSummary(BaseModel):
+    """MAP-phase summary of one source document"""
+    filename: str = Field(description="Filename of the summarized document")
+    key_facts: List[str] = Field(description="Most interesting, surprising, and key facts or arguments")
+    quotes: List[str] = Field(description="Notable quotes or anecdotes worth discussing on air")
+    themes: List[str] = Field(description="Main themes of the document")
 
+
+class PodcastBatchDocumentSummary(PodcastDocumentSummary):
+    """MAP-phase summary of one document inside a batched prompt"""
+    id: int = Field(description="Numeric id of the <doc> section this summary belongs to")
+
+
+class PodcastBatchSummaries(BaseModel):
+    """MAP-phase summaries for every document in a batched prompt"""
+    summaries: List[PodcastBatchDocumentSummary] = Field(
+        description="Exactly one summary per <doc> section"
+    )
@@ -17,4 +17,8 @@ class GenerateReportRequest(BaseModel):
     """Request to generate a report"""
     document_ids: List[str] = Field(..., description="Document IDs to include in report")
     prompt: str = Field(..., description="Report generation prompt from frontend")
+    sections: Optional[List[str]] = Field(
+        default=None,
+        description="Optional section titles; each section is generated in parallel"
+    )
     # user_id and organization_id are extracted from JWT token by backend
@@ -0,0 +1,20 @@
+"""
+Summary Models
+Structured output for batched MAP-phase document summarization
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class BatchDocumentSummary(BaseModel):
+    """Summary of one document inside a batched prompt"""
+    id: int = Field(description="Numeric id of the <doc> section this summary belongs to")
+    summary: str = Field(description="Summary of that document")
+
+
+class BatchSummaries(BaseModel):
+    """Summaries for every document in a batched prompt"""
+    summaries: List[BatchDocumentSummary] = Field(
+        description="Exactly one summary per <doc> section"
+    )
@@ -24,7 +24,7 @@ async def generate_report(request: GenerateReportRequest, current_user: dict = D
     1. Takes document IDs and a prompt (from frontend)
     2. Uses Map-Reduce to process documents in parallel
     3. Streams progress updates via Server-Sent Events
-    4. Returns final report in markdown format
+    4. Streams report tokens as they are generated, then the final report in markdown format
 
     Args:
         request: GenerateReportRequest with document_ids and prompt
@@ -54,6 +54,12 @@ async def generate_report(request: GenerateReportRequest, current_user: dict = D
     event: progress
     data: {"message": "Generating final report...", "step": "reduce", "progress": 0.9}
 
+    event: delta
+    data: {"content": "# Report Title\\n\\n"}
+
+    event: delta
+    data: {"content": "## Section 1..."}
+
     event: report
     data: {"content": "# Report Title\\n\\n## Section 1..."}
 
@@ -92,7 +98,8 @@ async def generate_report(request: GenerateReportRequest, current_user: dict = D
                 document_ids=request.document_ids,
                 prompt=request.prompt,
                 user_id=user_id,
-                organization_id=organization_id
+                organization_id=organization_id,
+                sections=request.sections
             ),
             media_type="text/event-stream",
             headers={
@@ -2,11 +2,13 @@
 Upload Router - Document ingestion endpoints
 """
 
+import io
+import asyncio
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from pydantic import BaseModel
 from bson import ObjectId
-import base64
 from services.ingestion_service import get_ingestion_service
 from clients.youtube_downloader import get_youtube_downloader
 from tasks.ingestion_tasks import process_document_ids_task, process_youtube_document_task
@@ -16,6 +18,9 @@ from utils.file_utils import sanitize_filename, get_file_size_mb,get_file_extens
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
+# Max concurrent iDrive E2 uploads per request
+UPLOAD_CONCURRENCY = 5
+
 
 @router.post("/documents")
 async def upload_documents(
@@ -69,13 +74,11 @@ async def upload_documents(
         ingestion_service = get_ingestion_service()
 
         documents_data = []
+        contents = []
         for file in files:
             # Read file content
             content = await file.read()
 
-            # Encode to base64 for Celery JSON serialization
-            content_b64 = base64.b64encode(content).decode('utf-8')
-
             file_size_mb = get_file_size_mb(content)
 
             # Create document record with status="processing" (without file_key initially)
@@ -100,22 +103,56 @@ async def upload_documents(
             documents_data.append({
                 "document_id": document_id,
                 "file_key": file_key,
-                "content_b64": content_b64,
                 "filename": file.filename,
-                "content_type": file.content_type
+                "content_type": file.content_type,
+                "file_size_mb": file_size_mb
             })
+            contents.append(content)
 
             logger.info(f"📝 Created document record: {document_id} for {file.filename}")
 
+        upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def store_file(doc: dict, content: bytes) -> bool:
+            """Upload one file to iDrive E2; mark its document failed if the upload raises"""
+            try:
+                async with upload_semaphore:
+                    await ingestion_service.idrivee2_client.upload_file(
+                        file_obj=io.BytesIO(content),
+                        object_name=doc["file_key"],
+                        content_type=doc["content_type"]
+                    )
+                return True
+            except Exception as e:
+                logger.error(f"❌ Failed to store {doc['filename']}: {str(e)}")
+                await ingestion_service._update_document_status(
+                    document_id=doc["document_id"],
+                    status="failed",
+                    stage="failed",
+                    stage_description=f"Upload failed: {str(e)}",
+                    error=str(e),
+                    failed_at=datetime.utcnow()
+                )
+                return False
+
+        # Store files in parallel (bounded); Celery tasks only carry their file_keys
+        stored = await asyncio.gather(*(
+            store_file(doc, content) for doc, content in zip(documents_data, contents)
+        ))
+        uploaded_documents = [doc for doc, ok in zip(documents_data, stored) if ok]
+
+        if not uploaded_documents:
+            raise HTTPException(status_code=500, detail="Failed to store uploaded files")
+
         # Dispatch Celery task (will create individual worker tasks for each document)
         task = process_document_ids_task.delay(
-            documents_data=documents_data,
+            documents_data=uploaded_documents,
             folder_name=folder_name.strip(),
             user_id=user_id,
             organization_id=organization_id
         )
 
-        logger.info(f"✅ Created {len(documents_data)} document records and dispatched Celery task: {task.id}")
+        logger.info(f"✅ Created {len(documents_data)} document records and dispatched Celery task for {len(uploaded_documents)}: {task.id}")
 
         return {
             "success": True,
@@ -195,6 +195,32 @@ def create_podcasts_indexes(db):
     logger.info(f"📊 Podcasts collection: {created_count} created, {skipped_count} skipped\n")
 
 
+def create_document_summaries_indexes(db):
+    """Create indexes for document_summaries collection (MAP-phase summary cache)"""
+    logger.info("📊 Creating indexes for 'document_summaries' collection...")
+
+    collection = db["document_summaries"]
+    existing_indexes = collection.index_information()
+
+    indexes_to_create = [
+        ("document_id_1_prompt_version_1", [("document_id", ASCENDING), ("prompt_version", ASCENDING)], {"unique": True}),
+    ]
+
+    created_count = 0
+    skipped_count = 0
+
+    for index_name, index_keys, index_options in indexes_to_create:
+        if index_name not in existing_indexes:
+            collection.create_index(index_keys, name=index_name, **index_options)
+            logger.info(f"  ✅ Created index: {index_name}")
+            created_count += 1
+        else:
+            logger.info(f"  ⏭️  Index already exists: {index_name}")
+            skipped_count += 1
+
+    logger.info(f"📊 Document summaries collection: {created_count} created, {skipped_count} skipped\n")
+
+
 def main():
     """Main function to create all indexes"""
     try:
@@ -211,6 +237,7 @@ def main():
         create_agent_sessions_indexes(db)
         create_workflows_indexes(db)
         create_podcasts_indexes(db)
+        create_document_summaries_indexes(db)
 
         logger.info("✅ All indexes created successfully!")
         return 0
@@ -20,8 +20,11 @@ from clients.pinecone_client import get_pinecone_client
 from clients.chunker_client import (
     get_chunker_client,
     prepare_content_for_vectorization,
-    validate_content_for_embeddings
+    validate_content_for_embeddings,
+    count_tokens
 )
+from clients.rate_limiter import get_embedding_rate_limiter
+from services.summary_cache import delete_document_summaries
 from utils.file_utils import (
     extract_raw_data,
     validate_extracted_content,
@@ -44,6 +47,7 @@ class IngestionService:
         self.pinecone_client = get_pinecone_client()
         self.chunker_client = get_chunker_client()
         self.unstructured_client = get_unstructured_client()
+        self.embedding_rate_limiter = get_embedding_rate_limiter()
 
     def cleanup(self):
         """Clean up all client resources and thread pools"""
@@ -68,7 +72,8 @@ class IngestionService:
         folder_name: str,
         user_id: str = None,
         organization_id: str = None,
-        additional_metadata: Dict[str, Any] = None
+        additional_metadata: Dict[str, Any] = None,
+        file_already_uploaded: bool = False
     ) -> Dict[str, Any]:
         """
         Synchronous document processing for Celery tasks
@@ -84,6 +89,7 @@ class IngestionService:
             user_id: Optional user ID
             organization_id: Optional organization ID
             additional_metadata: Optional metadata
+            file_already_uploaded: Skip the E2 upload when file_key is already stored
         """
         logger.info(f"📄 Processing document sync {document_id}: {filename}")
 
@@ -104,11 +110,12 @@ class IngestionService:
             )
 
             # Step 2: Upload to E2 (sync)
-            self.idrivee2_client.upload_file_sync(
-                file_obj=io.BytesIO(file_content),
-                object_name=file_key,
-                content_type=content_type
-            )
+            if not file_already_uploaded:
+                self.idrivee2_client.upload_file_sync(
+                    file_obj=io.BytesIO(file_content),
+                    object_name=file_key,
+                    content_type=content_type
+                )
 
             # Step 3: Extract content (sync) - pass unstructured_client for proper cleanup
             raw_content = extract_raw_data(file_content, filename, folder_name, self.unstructured_client)
@@ -185,6 +192,9 @@ class IngestionService:
                     metadatas.append(metadata)
                     ids.append(f"{document_id}_{chunk['chunk_id']}")
 
+                # Wait for embedding quota (shared across all workers)
+                if self.embedding_rate_limiter.enabled:
+                    self.embedding_rate_limiter.acquire(tokens=sum(count_tokens(t) for t in texts))
                 self.pinecone_client.add_documents(
                     texts=texts,
                     metadatas=metadatas,
@@ -240,6 +250,12 @@ class IngestionService:
                         for i in range(len(chunks))
                     ]
 
+                    # Wait for embedding quota (shared across all workers)
+                    if self.embedding_rate_limiter.enabled:
+                        self.embedding_rate_limiter.acquire(
+                            tokens=sum(chunk["metadata"].get("token_count") or count_tokens(chunk["text"]) for chunk in chunks)
+                        )
+
                     self.pinecone_client.add_documents(
                         texts=texts,
                         metadatas=metadatas,
@@ -1144,10 +1160,11 @@ class IngestionService:
         # Convert document_id to ObjectId for MongoDB query
         doc_object_id = ObjectId(document_id)
 
-        # Get document from MongoDB (async)
+        # Get document from MongoDB (async) - only the fields deletion needs, not the extracted content
         document = await self.mongodb_client.async_find_document(
             collection="documents",
-            query={"_id": doc_object_id}
+            query={"_id": doc_object_id},
+            projection={"file_key": 1, "organization_id": 1}
         )
 
         if not document:
@@ -1180,6 +1197,9 @@ class IngestionService:
             query={"_id": doc_object_id}
         )
 
+        # Drop cached MAP summaries so they don't outlive the document
+        await delete_document_summaries(document_id)
+
         logger.info(f"✅ Document deleted: {document_id}")
 
         return {
@@ -4,16 +4,26 @@ Generates multi-speaker podcast scripts from documents using MapReduce (Gemini v
 """
 
 import asyncio
+import json
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
 
 from bson import ObjectId
 from clients.mongodb_client import get_mongodb_client
-from models.podcast import PodcastScript, PodcastSegment
+from models.podcast import (
+    PodcastScript,
+    PodcastSegment,
+    PodcastDocumentSummary,
+    PodcastBatchSummaries
+)
 from clients.ultimate_llm import get_llm
 from app.logger import logger
 from app.settings import settings
+from utils.batching import summarize_documents
+from utils.object_ids import unique_object_ids
 from clients.idrivee2_client import get_idrivee2_client
+from services.summary_cache import SummaryCache
 import io
 from pydub import AudioSegment
 
@@ -33,6 +43,12 @@ class PodcastService:
     VOICE_SPEAKER_1 = "21m00Tcm4TlvDq8ikWAM"  # Rachel (Female)
     VOICE_SPEAKER_2 = "AZnzlk1XvdvUeBnXmlld"  # Dombi (Male)
 
+    # Cache version of the MAP prompts in _map_reduce_pipeline
+    SUMMARY_PROMPT_VERSION = "podcast-map-v2"
+
+    # Silence inserted between speaker segments
+    PAUSE_DURATION_MS = 500
+
     def __init__(self):
         """Initialize podcast service"""
 
@@ -40,16 +56,26 @@ class PodcastService:
         
         # Structured output for final script (ensure valid JSON)
         self.structured_llm = self.llm_flash.with_structured_output(PodcastScript)
+        # Structured MAP summaries keep the REDUCE input compact (JSON instead of prose)
+        self.summary_llm = self.llm_flash.with_structured_output(PodcastDocumentSummary)
+        self.batch_summary_llm = self.llm_flash.with_structured_output(PodcastBatchSummaries)
         
         self.mongodb_client = get_mongodb_client()
+        self.summary_cache = SummaryCache(self.SUMMARY_PROMPT_VERSION)
         self.idrive = get_idrivee2_client()
 
+        # Flash is the low-latency TTS model; override via ELEVENLABS_MODEL_ID
+        self.tts_model_id = settings.ELEVENLABS_MODEL_ID or "eleven_flash_v2_5"
+
         if settings.ELEVENLABS_API_KEY and AsyncElevenLabs:
             self.elevenlabs = AsyncElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
         else:
             self.elevenlabs = None
             logger.warning("ElevenLabs client not initialized (Missing Key or SDK)")
 
+        # 0.5s pause between speakers, MP3-encoded on first use and reused for every segment
+        self._pause_mp3: Optional[bytes] = None
+
     async def generate_script(self, document_ids: List[str]) -> PodcastScript:
         """
         Generate a podcast script from a list of document IDs.
@@ -65,21 +91,25 @@ class PodcastService:
             
         logger.info(f"🎙️ Fetching {len(document_ids)} documents for podcast generation...")
         
-        # Fetch documents from MongoDB
-        documents = []
-        for doc_id in document_ids:
-            if not ObjectId.is_valid(doc_id):
-                logger.warning(f"Invalid ObjectId: {doc_id}")
-                continue
-                
-            doc = await self.mongodb_client.async_find_document(
+        valid_oids = unique_object_ids(document_ids)
+
+        # Fetch documents from MongoDB in a single round-trip
+        docs_by_id = {}
+        if valid_oids:
+            found = await self.mongodb_client.async_find_documents(
                 collection="documents",
-                query={"_id": ObjectId(doc_id)}
+                query={"_id": {"$in": valid_oids}}
             )
+            docs_by_id = {doc["_id"]: doc for doc in found}
+
+        # Preserve the requested order
+        documents = []
+        for oid in valid_oids:
+            doc = docs_by_id.get(oid)
             if doc:
                 documents.append(doc)
             else:
-                logger.warning(f"Document not found: {doc_id}")
+                logger.warning(f"Document not found: {oid}")
         
         if not documents:
             raise ValueError("No valid documents found from provided IDs")
@@ -90,17 +120,16 @@ class PodcastService:
     async def _map_reduce_pipeline(self, documents: List[Dict]) -> PodcastScript:
         """
         MapReduce Strategy:
-        1. Map: Summarize each document individually (Parallel with Semaphore)
+        1. Map: Summarize documents in mini-batches (utils.batching.summarize_documents)
         2. Reduce: Synthesize script from summaries
         """
         logger.info(f"🗺️ Starting MapReduce Pipeline for {len(documents)} documents...")
         
-        # --- Step A: MAP (Summarize each document) ---
-        semaphore = asyncio.Semaphore(5)
-        
+        # --- Step A: MAP (Summarize documents in mini-batches) ---
         summary_prompt = ChatPromptTemplate.from_template(
             """Analyze this document and extract the most interesting, surprising, and key information. 
             Focus on details that would make for good podcast conversation (anecdotes, facts, arguments).
+            Return the key facts, notable quotes, and main themes.
             
             DOCUMENT: {filename}
             CONTENT:
@@ -108,42 +137,18 @@ class PodcastService:
             """
         )
 
-        async def process_doc(doc):
-            async with semaphore:
-                content = doc.get("raw_content", "")
-                if not content:
-                    return ""
-                
-                filename = doc.get("filename", "Unknown Doc")
-                try:
-                    # We use the standard LLM (string output) for summaries, not structured
-                    result = await self.llm_flash.ainvoke(
-                        summary_prompt.format_messages(text=content, filename=filename)
-                    )
-                    return result.content
-                except Exception as e:
-                    logger.error(f"Error summarizing document {filename}: {e}")
-                    return ""
-
-        logger.info(f"⏳ Summarizing {len(documents)} documents in parallel (Concurrency: 5)...")
-        tasks = [process_doc(doc) for doc in documents]
-        summaries = await asyncio.gather(*tasks)
-        
-        # Filter empty summaries
-        valid_summaries = [s for s in summaries if s]
-        
-        if not valid_summaries:
-            raise ValueError("Failed to generate any summaries from documents")
+        batch_summary_prompt = ChatPromptTemplate.from_template(
+            """Analyze each document below and extract the most interesting, surprising, and key information.
+            Focus on details that would make for good podcast conversation (anecdotes, facts, arguments).
+            Summarize every <doc> section separately and return one summary per doc id,
+            each with its filename, key facts, notable quotes, and main themes.
             
-        combined_summary = "\n\n".join(valid_summaries)
-        logger.info(f"✅ Map Phase Complete: {len(valid_summaries)} summaries generated")
-
-        # --- Step B: REDUCE (Generate Script) ---
+            {docs}
+            """
+        )
 
-        logger.info("📝 Synthesizing Final Script...")
-        
-        # Add current datetime for context
-        from datetime import datetime
+        # REDUCE prompt and context are built up front so the script call can fire
+        # the moment the last MAP summary lands
         current_context = f"Current Date/Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         current_context += "Location: Unknown (Default)\n"
         
@@ -165,9 +170,44 @@ class PodcastService:
             CONTEXT:
             {context}
             """),
-            ("user", "Research Material:\n{summaries}")
+            ("user", "Research Material (JSON array of document summaries):\n{summaries}")
         ])
 
+        docs_with_content = [doc for doc in documents if doc.get("raw_content")]
+
+        summary_by_id, cache_writes = await summarize_documents(
+            docs_with_content,
+            summary_cache=self.summary_cache,
+            summary_llm=self.summary_llm,
+            build_summary_prompt=lambda doc: summary_prompt.format_messages(
+                text=doc["raw_content"], filename=doc.get("filename", "Unknown Doc")
+            ),
+            parse_summary=lambda result: result.model_dump(),
+            batch_summary_llm=self.batch_summary_llm,
+            build_batch_summary_prompt=lambda batch: batch_summary_prompt.format_messages(docs="\n\n".join(
+                f'<doc id={i} filename="{doc.get("filename", "Unknown Doc")}">\n{doc["raw_content"]}\n</doc>'
+                for i, doc in enumerate(batch)
+            )),
+            parse_batch_summary=lambda item: PodcastDocumentSummary(
+                **item.model_dump(exclude={"id"})
+            ).model_dump()
+        )
+        summaries = [summary_by_id.get(str(doc["_id"])) for doc in docs_with_content]
+        
+        # Filter empty summaries
+        valid_summaries = [s for s in summaries if s]
+        
+        if not valid_summaries:
+            raise ValueError("Failed to generate any summaries from documents")
+            
+        # Compact JSON array of typed summaries - fewer REDUCE tokens than prose
+        combined_summary = json.dumps(valid_summaries, ensure_ascii=False)
+        logger.info(f"✅ Map Phase Complete: {len(valid_summaries)} summaries generated")
+
+        # --- Step B: REDUCE (Generate Script) ---
+
+        logger.info("📝 Synthesizing Final Script...")
+
         # Use structured output to define the PodcastScript object
         script: PodcastScript = await self.structured_llm.ainvoke(
             script_prompt.format_messages(
@@ -175,7 +215,11 @@ class PodcastService:
                 context=current_context
             )
         )
-        
+
+        # Cache writes ran alongside REDUCE; make sure they have landed
+        await asyncio.gather(*cache_writes)
+
+
         logger.info(f"✅ Script Generation Complete: '{script.title}' with {len(script.segments)} segments")
         return script
 
@@ -241,13 +285,36 @@ class PodcastService:
                 )
             raise e
 
+    @staticmethod
+    def _encode_silence_mp3(duration_ms: int) -> bytes:
+        """
+        Encode silence as MP3 matching the ElevenLabs mp3_44100_128 output format
+
+        The ID3v2 tag and Xing/Info frame are left out: the pause is spliced
+        between segments many times, and headers mid-stream make players report
+        the wrong duration and break seeking.
+        """
+        silence = AudioSegment.silent(duration=duration_ms, frame_rate=44100)
+        return silence.export(
+            io.BytesIO(),
+            format="mp3",
+            bitrate="128k",
+            parameters=["-write_xing", "0", "-id3v2_version", "0"]
+        ).getvalue()
+
     async def _generate_audio(self, segments: List[PodcastSegment], organization_id: str, podcast_id: str = None) -> str:
         """
         Generate audio for each segment, stitch, and upload.
         """
         logger.info(f"🎙️ Generating Audio (ElevenLabs) for {len(segments)} segments...")
-        
-        combined_audio = AudioSegment.empty()
+
+        if self._pause_mp3 is None:
+            # ffmpeg encode - keep it off the event loop
+            self._pause_mp3 = await asyncio.to_thread(self._encode_silence_mp3, self.PAUSE_DURATION_MS)
+
+        # All segments share the same MP3 format (44.1kHz/128kbps), so frames can be
+        # concatenated byte-wise with the pre-encoded pause in between.
+        parts: List[bytes] = []
         
         for i, seg in enumerate(segments):
             # Alternate voices 
@@ -256,28 +323,25 @@ class PodcastService:
             
             try:
                 # Generate audio stream (Non-streaming)
-                audio_bytes = b""
+                # Accumulate in a bytearray - bytes += chunk re-copies the whole buffer each time
+                buf = bytearray()
                 async for chunk in self.elevenlabs.text_to_speech.convert(
                     text=seg.text,
                     voice_id=voice_id,
-                    model_id="eleven_multilingual_v2",
+                    model_id=self.tts_model_id,
                     output_format="mp3_44100_128"
                 ):
-                    audio_bytes += chunk
+                    buf.extend(chunk)
                 
-                if not audio_bytes:
+                if not buf:
                     logger.warning(f"No audio generated for segment {i}")
                     continue
                 
-                logger.info(f"Segment {i}: Generated {len(audio_bytes)} bytes")
-
-                # Load into PyDub
-                segment_audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="mp3")
-                logger.info(f"Segment {i}: Duration {len(segment_audio)}ms")
-                combined_audio += segment_audio
+                logger.info(f"Segment {i}: Generated {len(buf)} bytes")
+                parts.append(bytes(buf))
                 
                 # Add a small natural pause between speakers (0.5s)
-                combined_audio += AudioSegment.silent(duration=500) 
+                parts.append(self._pause_mp3)
                 
             except Exception as e:
                 logger.error(f"Error generating audio for segment {i}: {e}")
@@ -285,11 +349,9 @@ class PodcastService:
                 # Ideally we want a fail-safe or retry. For now, log and continue.
                 continue
 
-        # Export full episode
-        logger.info("💾 Stitching and uploading full episode...")
-        buffer = io.BytesIO()
-        combined_audio.export(buffer, format="mp3")
-        buffer.seek(0)
+        # Raw MP3 frames, no decode/re-encode
+        logger.info("💾 Uploading full episode...")
+        episode = io.BytesIO(b"".join(parts))
         
         # Upload to iDrive E2
         # Use provided ID or generate
@@ -297,7 +359,7 @@ class PodcastService:
              podcast_id = str(ObjectId())
              
         file_key = f"podcasts/{organization_id}/{podcast_id}/full_episode.mp3"
-        await self.idrive.upload_file(buffer, file_key, "audio/mpeg")
+        await self.idrive.upload_file(episode, file_key, "audio/mpeg")
         
         # Determine public URL (presigned or public bucket URL if public)
         # For now, return the file_key so it can be used to generate presigned URLs on demand
@@ -4,30 +4,44 @@ Generates comprehensive reports using Map-Reduce pattern
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 from datetime import datetime
 from bson import ObjectId
 
 from clients.mongodb_client import get_mongodb_client
 from clients.ultimate_llm import get_llm
+from models.summary_models import BatchSummaries
+from services.summary_cache import SummaryCache
+from utils.batching import summarize_documents
+from utils.object_ids import unique_object_ids
+from utils.streaming import format_sse_event
 from app.logger import logger
 
 
 class ReportGeneratorService:
     """Service for generating reports using Map-Reduce"""
 
+    # REDUCE phase: parallel per-section generation when the request lists sections
+    REDUCE_SECTION_CONCURRENCY = 4
+
+    # Cache version of _build_summary_prompt / _build_batch_summary_prompt
+    SUMMARY_PROMPT_VERSION = "report-map-v1"
+
     def __init__(self):
         """Initialize report generator service"""
         self.mongodb_client = get_mongodb_client()
         self.llm = get_llm(model="google/gemini-3-flash-preview", provider="openrouter")
+        self.batch_summary_llm = self.llm.with_structured_output(BatchSummaries)
+        self.summary_cache = SummaryCache(self.SUMMARY_PROMPT_VERSION)
 
     async def generate_report_stream(
         self,
         document_ids: List[str],
         prompt: str,
         user_id: Optional[str] = None,
-        organization_id: Optional[str] = None
-    ) -> AsyncGenerator[str, None]:
+        organization_id: Optional[str] = None,
+        sections: Optional[List[str]] = None
+    ) -> AsyncGenerator[bytes, None]:
         """
         Generate report using Map-Reduce with streaming progress updates
 
@@ -39,40 +53,52 @@ class ReportGeneratorService:
             prompt: User's report generation prompt (from selected format)
             user_id: Optional user ID
             organization_id: Optional organization ID
+            sections: Optional report section titles to generate in parallel
 
         Yields:
-            Server-Sent Events with progress and final report
+            Server-Sent Events with progress, report deltas and final report
         """
         try:
-            total_docs = len(document_ids)
+            document_oids = unique_object_ids(document_ids)
+            total_docs = len(document_oids)
             logger.info(f"📊 Starting report generation for {total_docs} documents")
 
             # Send start event
-            yield f"event: start\ndata: {{\"message\": \"Starting report generation\"}}\n\n"
+            yield format_sse_event("start", {"message": "Starting report generation"})
 
             # MAP Phase: Summarize each document in parallel
-            yield f"event: progress\ndata: {{\"message\": \"Analyzing documents...\", \"step\": \"map\", \"progress\": 0.0}}\n\n"
+            yield format_sse_event("progress", {"message": "Analyzing documents...", "step": "map", "progress": 0.0})
 
-            summaries = await self._map_summarize_documents(document_ids, total_docs, self._yield_progress)
+            summaries, cache_writes = await self._map_summarize_documents(document_oids, total_docs, self._yield_progress)
 
             if not summaries:
-                yield f"event: error\ndata: {{\"error\": \"No document summaries generated\"}}\n\n"
+                yield format_sse_event("error", {"error": "No document summaries generated"})
                 return
 
             # REDUCE Phase: Combine summaries with prompt
-            yield f"event: progress\ndata: {{\"message\": \"Generating final report...\", \"step\": \"reduce\", \"progress\": 0.9}}\n\n"
+            yield format_sse_event("progress", {"message": "Generating final report...", "step": "reduce", "progress": 0.9})
 
-            final_report = await self._reduce_create_report(summaries, prompt)
+            # Stream report tokens as they are generated so the client renders progressively
+            report_parts = []
+            async for text in self._reduce_stream_report(summaries, prompt, sections):
+                report_parts.append(text)
+                yield format_sse_event("delta", {"content": text})
+
+            final_report = "".join(report_parts)
+            logger.info(f"✅ REDUCE Phase complete: Generated {len(final_report)} character report")
+
+            # Cache writes ran alongside REDUCE; make sure they have landed
+            await asyncio.gather(*cache_writes)
 
             # Send final report
-            yield f"event: report\ndata: {{\"content\": {self._escape_json(final_report)}}}\n\n"
-            yield f"event: complete\ndata: {{\"message\": \"Report generation complete\"}}\n\n"
+            yield format_sse_event("report", {"content": final_report})
+            yield format_sse_event("complete", {"message": "Report generation complete"})
 
             logger.info(f"✅ Report generation completed: {len(final_report)} characters")
 
         except Exception as e:
             logger.error(f"❌ Report generation failed: {str(e)}")
-            yield f"event: error\ndata: {{\"error\": \"{str(e)}\"}}\n\n"
+            yield format_sse_event("error", {"error": str(e)})
 
     async def _yield_progress(self, current: int, total: int):
         """Helper to yield progress - not used in generator but kept for structure"""
@@ -80,47 +106,71 @@ class ReportGeneratorService:
 
     async def _map_summarize_documents(
         self,
-        document_ids: List[str],
+        document_oids: List[ObjectId],
         total: int,
         progress_callback
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[List[Dict[str, Any]], List[asyncio.Task]]:
         """
-        MAP Phase: Summarize each document in parallel with semaphore
+        MAP Phase: Fetch documents and summarize them via summarize_documents
 
         Args:
-            document_ids: List of document IDs
+            document_oids: Unique, validated document ObjectIds
             total: Total number of documents
             progress_callback: Callback for progress updates
 
         Returns:
-            List of document summaries
+            Tuple of (document summaries, pending summary cache writes)
         """
-        logger.info(f"📊 MAP Phase: Summarizing {len(document_ids)} documents")
-
-        # Semaphore to limit concurrent processing to 5
-        semaphore = asyncio.Semaphore(5)
-
-        async def summarize_one_document(doc_id: str, index: int) -> Dict[str, Any]:
-            """Summarize a single document with semaphore"""
-            async with semaphore:
-                try:
-                    # Query MongoDB for raw_content
-                    document = await self.mongodb_client.async_find_document(
-                        collection="documents",
-                        query={"_id": ObjectId(doc_id)}
-                    )
-
-                    if not document:
-                        return {"document_id": doc_id, "summary": "Document not found", "success": False}
-
-                    raw_content = document.get("raw_content", "")
-                    filename = document.get("filename", "Unknown")
-
-                    if not raw_content:
-                        return {"document_id": doc_id, "filename": filename, "summary": "No content found", "success": False}
-
-                    # Ask LLM to summarize
-                    summary_prompt = f"""Summarize this document comprehensively. Include:
+        logger.info(f"📊 MAP Phase: Summarizing {len(document_oids)} documents")
+
+        # Fetch all documents in one round-trip instead of one query per document
+        documents_by_id = {}
+        if document_oids:
+            found = await self.mongodb_client.async_find_documents(
+                collection="documents",
+                query={"_id": {"$in": document_oids}}
+            )
+            documents_by_id = {doc["_id"]: doc for doc in found}
+
+        # Skip documents that are missing or have no content before batching
+        documents = []
+        for doc_id in document_oids:
+            document = documents_by_id.get(doc_id)
+            if not document:
+                logger.warning(f"⚠️ Document not found: {doc_id}")
+            elif not document.get("raw_content"):
+                logger.warning(f"⚠️ No content found for document: {doc_id}")
+            else:
+                documents.append(document)
+
+        summary_by_id, cache_writes = await summarize_documents(
+            documents,
+            summary_cache=self.summary_cache,
+            summary_llm=self.llm,
+            build_summary_prompt=self._build_summary_prompt,
+            parse_summary=lambda response: response.content if hasattr(response, 'content') else str(response),
+            batch_summary_llm=self.batch_summary_llm,
+            build_batch_summary_prompt=self._build_batch_summary_prompt,
+            parse_batch_summary=lambda item: item.summary
+        )
+
+        successful_summaries = [
+            {
+                "document_id": str(doc["_id"]),
+                "filename": doc.get("filename", "Unknown"),
+                "summary": summary_by_id[str(doc["_id"])],
+                "success": True
+            }
+            for doc in documents
+            if str(doc["_id"]) in summary_by_id
+        ]
+        logger.info(f"✅ MAP Phase complete: {len(successful_summaries)}/{len(document_oids)} documents summarized")
+
+        return successful_summaries, cache_writes
+
+    def _build_summary_prompt(self, document: Dict[str, Any]) -> str:
+        """Build the MAP prompt for a single document"""
+        return f"""Summarize this document comprehensively. Include:
 - Main topics and themes
 - Key findings and insights
 - Important data, facts, or quotes
@@ -128,47 +178,49 @@ class ReportGeneratorService:
 
 Be thorough but concise. This summary will be used to generate a larger report.
 
-Document: {filename}
+Document: {document.get("filename", "Unknown")}
 
 Content:
-{raw_content}"""
-
-                    response = await self.llm.ainvoke(summary_prompt)
-                    summary = response.content if hasattr(response, 'content') else str(response)
-
-                    logger.info(f"✅ Summarized document {index + 1}/{total}: {filename}")
-
-                    return {
-                        "document_id": doc_id,
-                        "filename": filename,
-                        "summary": summary,
-                        "success": True
-                    }
-
-                except Exception as e:
-                    logger.error(f"❌ Failed to summarize document {doc_id}: {str(e)}")
-                    return {"document_id": doc_id, "summary": str(e), "success": False}
-
-        # Process all documents in parallel (MAP) with semaphore limiting to 5 concurrent
-        tasks = [summarize_one_document(doc_id, i) for i, doc_id in enumerate(document_ids)]
-        summaries = await asyncio.gather(*tasks)
+{document["raw_content"]}"""
+
+    def _build_batch_summary_prompt(self, batch: List[Dict[str, Any]]) -> str:
+        """Build the MAP prompt for a mini-batch of documents"""
+        docs_text = "\n\n".join(
+            f'<doc id={i} filename="{doc.get("filename", "Unknown")}">\n{doc["raw_content"]}\n</doc>'
+            for i, doc in enumerate(batch)
+        )
+        return f"""Summarize each document below comprehensively. For every document include:
+- Main topics and themes
+- Key findings and insights
+- Important data, facts, or quotes
+- Core concepts and ideas
 
-        # Filter out failed summaries
-        successful_summaries = [s for s in summaries if s.get("success")]
-        logger.info(f"✅ MAP Phase complete: {len(successful_summaries)}/{len(document_ids)} documents summarized")
+Be thorough but concise. These summaries will be used to generate a larger report.
+Summarize every <doc> section separately and return one summary per doc id.
 
-        return successful_summaries
+{docs_text}"""
 
-    async def _reduce_create_report(self, summaries: List[Dict[str, Any]], user_prompt: str) -> str:
+    async def _reduce_stream_report(
+        self,
+        summaries: List[Dict[str, Any]],
+        user_prompt: str,
+        sections: Optional[List[str]] = None
+    ) -> AsyncGenerator[str, None]:
         """
         REDUCE Phase: Combine document summaries into final report using user's prompt
 
+        When the request lists sections, the title/introduction and each section
+        are generated by their own LLM calls in parallel and emitted in order as
+        soon as all earlier parts are done. Otherwise the report is generated in
+        a single streamed call.
+
         Args:
             summaries: List of document summaries from MAP phase
             user_prompt: User's prompt specifying report structure and focus
+            sections: Optional section titles from the request
 
-        Returns:
-            Final report as markdown string
+        Yields:
+            Report markdown text chunks as the LLM generates them
         """
         logger.info(f"🔄 REDUCE Phase: Creating final report from {len(summaries)} summaries")
 
@@ -178,6 +230,66 @@ Content:
             for s in summaries
         ])
 
+        if sections and len(sections) >= 2:
+            logger.info(f"🧩 REDUCE Phase: Generating {len(sections)} sections in parallel")
+            outline = ", ".join(sections)
+            # Part 0 is the title and introduction, then one part per section
+            part_prompts = [
+                f"""{user_prompt}
+
+Here are summaries of all the documents:
+
+{combined_summaries}
+
+You are writing the opening of the report described above, whose sections are: {outline}.
+
+IMPORTANT:
+- Start with a "# " markdown heading containing the report title
+- Follow it with a short introduction to the report
+- Do not write any of the sections themselves"""
+            ] + [
+                f"""{user_prompt}
+
+Here are summaries of all the documents:
+
+{combined_summaries}
+
+You are writing ONE section of the report described above. Write only the section titled "{section}" (section {index} of {len(sections)}: {outline}).
+
+IMPORTANT:
+- Start with a "## {section}" markdown heading
+- Do not write any other section, introduction or closing remarks
+- Be thorough and detailed
+- Synthesize information across all documents, don't just list summaries"""
+                for index, section in enumerate(sections, 1)
+            ]
+
+            # Emit parts in order as soon as every earlier part has completed
+            completed: Dict[int, str] = {}
+            next_part = 0
+            part_results = self.llm.abatch_as_completed(
+                part_prompts,
+                config={"max_concurrency": self.REDUCE_SECTION_CONCURRENCY},
+                return_exceptions=True
+            )
+            try:
+                async for index, response in part_results:
+                    if isinstance(response, Exception):
+                        if next_part:
+                            raise response
+                        logger.warning(f"⚠️ Parallel section generation failed, falling back to single report: {str(response)}")
+                        break
+                    text = response.content if hasattr(response, 'content') else str(response)
+                    completed[index] = text.strip() + "\n\n"
+                    while next_part in completed:
+                        yield completed.pop(next_part)
+                        next_part += 1
+                else:
+                    return
+            finally:
+                # Cancel section calls still in flight before falling back or raising
+                await part_results.aclose()
+
         # Create final report prompt
         final_prompt = f"""{user_prompt}
 
@@ -193,17 +305,10 @@ IMPORTANT:
 - Structure the report with clear sections and headings
 - Synthesize information across all documents, don't just list summaries"""
 
-        response = await self.llm.ainvoke(final_prompt)
-        final_report = response.content if hasattr(response, 'content') else str(response)
-
-        logger.info(f"✅ REDUCE Phase complete: Generated {len(final_report)} character report")
-
-        return final_report
-
-    def _escape_json(self, text: str) -> str:
-        """Escape text for JSON string"""
-        import json
-        return json.dumps(text)
+        async for chunk in self.llm.astream(final_prompt):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                yield text
 
 
 # Singleton instance
@@ -0,0 +1,112 @@
+"""
+Document Summary Cache
+Caches MAP-phase document summaries in MongoDB so repeat podcast/report runs
+skip the LLM for documents whose content hasn't changed.
+
+Entries are keyed by (document_id, content_sha256, prompt_version). MAP summaries
+don't depend on the user's prompt, so it is deliberately not part of the key.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List
+
+from clients.mongodb_client import get_mongodb_client
+from app.logger import logger
+
+DOCUMENT_SUMMARIES_COLLECTION = "document_summaries"
+
+
+def content_sha256(content: str) -> str:
+    """Hash document content for cache keying"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """MongoDB-backed cache of per-document summaries for one MAP prompt version"""
+
+    def __init__(self, prompt_version: str):
+        """
+        Initialize summary cache
+
+        Args:
+            prompt_version: Version tag of the MAP prompt; bump it when the prompt changes
+        """
+        self.prompt_version = prompt_version
+        self.mongodb_client = get_mongodb_client()
+
+    async def get_many(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Look up cached summaries for documents in a single query
+
+        Args:
+            documents: MongoDB documents with _id and raw_content
+
+        Returns:
+            Dict mapping document_id to cached summary (hits only)
+        """
+        hashes = {str(doc["_id"]): content_sha256(doc["raw_content"]) for doc in documents}
+        if not hashes:
+            return {}
+
+        try:
+            entries = await self.mongodb_client.async_find_documents(
+                collection=DOCUMENT_SUMMARIES_COLLECTION,
+                query={
+                    "document_id": {"$in": list(hashes)},
+                    "prompt_version": self.prompt_version
+                },
+                projection={"document_id": 1, "content_sha256": 1, "summary": 1}
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Summary cache lookup failed: {str(e)}")
+            return {}
+
+        hits = {
+            entry["document_id"]: entry["summary"]
+            for entry in entries
+            if hashes.get(entry["document_id"]) == entry.get("content_sha256")
+        }
+        logger.info(f"📦 Summary cache: {len(hits)}/{len(hashes)} hits ({self.prompt_version})")
+        return hits
+
+    async def set(self, document: Dict[str, Any], summary: Any) -> None:
+        """
+        Store a document summary, replacing any entry for an older content hash
+
+        Args:
+            document: MongoDB document with _id and raw_content
+            summary: Summary to cache
+        """
+        try:
+            await self.mongodb_client.async_upsert_document(
+                collection=DOCUMENT_SUMMARIES_COLLECTION,
+                query={
+                    "document_id": str(document["_id"]),
+                    "prompt_version": self.prompt_version
+                },
+                update={
+                    "content_sha256": content_sha256(document["raw_content"]),
+                    "summary": summary,
+                    "updated_at": datetime.utcnow()
+                },
+                set_on_insert={"created_at": datetime.utcnow()}
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to cache summary for {document['_id']}: {str(e)}")
+
+
+async def delete_document_summaries(document_id: str) -> None:
+    """
+    Remove cached summaries of a document for every prompt version
+
+    Args:
+        document_id: MongoDB document ID string
+    """
+    try:
+        await get_mongodb_client().async_delete_documents(
+            collection=DOCUMENT_SUMMARIES_COLLECTION,
+            query={"document_id": document_id}
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to delete cached summaries for {document_id}: {str(e)}")
@@ -2,15 +2,133 @@
 Document Ingestion Celery Tasks
 Processes documents using existing MongoDB document IDs
 """
-import gc
-import base64
-from typing import Dict, Any, List
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from bson import ObjectId
+from celery import group
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from app.worker import celery_app
+from app.settings import settings
 from services.ingestion_service import IngestionService
+from utils.file_utils import get_file_extension, is_video_file, is_audio_file
 from app.logger import logger
 
+# Upload sub-batching. Documents are spread over INGESTION_WORKER_CONCURRENCY
+# batches so every worker slot gets work; batches are also capped by count and
+# size so they finish well inside task_time_limit. Video/audio and large files
+# always get their own task so they never hold up a batch.
+DOCUMENT_BATCH_MAX_SIZE = 10
+DOCUMENT_BATCH_MAX_MB = 50
+DOCUMENT_SOLO_MIN_MB = 20
+
+# Shared per worker process so tasks reuse the same storage/DB/vector clients
+# instead of reconnecting for every document. Prefork children build it in
+# worker_process_init; the threads pool has no child processes, so it is built
+# lazily by the first task and the lock keeps concurrent threads from each
+# creating one.
+_INGESTION: IngestionService = None
+_INGESTION_LOCK = threading.Lock()
+
+
+def _get_ingestion_service() -> IngestionService:
+    """Return the worker's shared IngestionService (created lazily if the init signal did not run)"""
+    global _INGESTION
+    if _INGESTION is None:
+        with _INGESTION_LOCK:
+            if _INGESTION is None:
+                _INGESTION = IngestionService()
+    return _INGESTION
+
+
+@worker_process_init.connect
+def init_ingestion_service(**kwargs):
+    """Build the shared IngestionService when a worker process starts"""
+    _get_ingestion_service()
+    logger.info("🔧 Initialized shared IngestionService for worker process")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def cleanup_ingestion_service(**kwargs):
+    """
+    Close client connections (storage, Pinecone, Unstructured httpx) when the
+    worker process exits - pool child recycle, or worker shutdown for the
+    threads pool where no child process signals fire
+    """
+    global _INGESTION
+    with _INGESTION_LOCK:
+        if _INGESTION is not None:
+            _INGESTION.cleanup()
+            _INGESTION = None
+
+
+def _plan_document_tasks(documents_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+    """
+    Split uploaded documents into solo documents and small-file batches
+
+    Args:
+        documents_data: Document dicts from the upload endpoint (with file_size_mb)
+
+    Returns:
+        Tuple of (documents that get their own task, batches of small documents)
+    """
+    solo, batchable = [], []
+    for doc_data in documents_data:
+        extension = get_file_extension(doc_data["filename"])
+        size_mb = doc_data.get("file_size_mb") or 0
+        if is_video_file(extension) or is_audio_file(extension) or size_mb >= DOCUMENT_SOLO_MIN_MB:
+            solo.append(doc_data)
+        else:
+            batchable.append(doc_data)
+
+    batch_size = min(
+        DOCUMENT_BATCH_MAX_SIZE,
+        math.ceil(len(batchable) / max(settings.INGESTION_WORKER_CONCURRENCY, 1))
+    )
+
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_mb = 0.0
+    for doc_data in batchable:
+        size_mb = doc_data.get("file_size_mb") or 0
+        if current and (len(current) >= batch_size or current_mb + size_mb > DOCUMENT_BATCH_MAX_MB):
+            batches.append(current)
+            current = []
+            current_mb = 0.0
+        current.append(doc_data)
+        current_mb += size_mb
+    if current:
+        batches.append(current)
+
+    return solo, batches
+
+
+def _mark_documents_failed(documents: List[Dict[str, Any]], error: str):
+    """Mark documents failed so they don't stay in "processing" after a task is cut short"""
+    mongodb_client = _get_ingestion_service().mongodb_client
+    for doc_data in documents:
+        try:
+            mongodb_client.update_document(
+                collection="documents",
+                query={"_id": ObjectId(doc_data["document_id"])},
+                update={
+                    "status": "failed",
+                    "processing_stage": "failed",
+                    "processing_stage_description": f"Processing failed: {error}",
+                    "error": error,
+                    "failed_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow()
+                }
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to mark document {doc_data['document_id']} as failed: {str(e)}")
 
-@celery_app.task
+
+@celery_app.task(queue="docs")
 def process_document_ids_task(
     documents_data: List[Dict[str, Any]],
     folder_name: str,
@@ -18,51 +136,72 @@ def process_document_ids_task(
     organization_id: str = None
 ) -> Dict[str, Any]:
     """
-    Main Celery task - creates individual tasks for each document
+    Main Celery task - gives video/audio and large documents their own worker
+    task and groups the rest into sub-batches (one task per batch). Files are
+    already stored in iDrive E2 by the upload endpoint, so the broker only
+    carries IDs and file keys.
 
     Args:
         documents_data: List of dicts with:
             - document_id: MongoDB document ID (already created)
-            - content_b64: Base64-encoded file content
+            - file_key: iDrive E2 file path (file already uploaded)
             - filename: Original filename
             - content_type: MIME type
+            - file_size_mb: File size in MB
         folder_name: Folder name
         user_id: User ID
         organization_id: Organization ID
 
     Returns:
-        Dict with task IDs
+        Dict with task IDs (documents in the same batch share a task ID)
     """
     logger.info(f"📦 Main task: Distributing {len(documents_data)} documents to workers")
 
     task_info = []
+    solo, batches = _plan_document_tasks(documents_data)
+    assignments = [[doc_data] for doc_data in solo] + batches
+    signatures = [
+        process_single_document_task.s(
+            document_id=doc_data["document_id"],
+            file_key=doc_data["file_key"],
+            filename=doc_data["filename"],
+            content_type=doc_data["content_type"],
+            folder_name=folder_name,
+            user_id=user_id,
+            organization_id=organization_id
+        )
+        for doc_data in solo
+    ] + [
+        process_document_batch_task.s(
+            documents=batch,
+            folder_name=folder_name,
+            user_id=user_id,
+            organization_id=organization_id
+        )
+        for batch in batches
+    ]
 
-    # Create individual Celery task for each document
-    for doc_data in documents_data:
-        try:
-            # Launch individual worker task
-            task = process_single_document_task.delay(
-                document_id=doc_data["document_id"],
-                file_key=doc_data["file_key"],
-                content_b64=doc_data["content_b64"],
-                filename=doc_data["filename"],
-                content_type=doc_data["content_type"],
-                folder_name=folder_name,
-                user_id=user_id,
-                organization_id=organization_id
-            )
-
-            task_info.append({
-                "document_id": doc_data["document_id"],
-                "filename": doc_data["filename"],
-                "task_id": task.id,
-                "status": "queued"
-            })
-
-            logger.info(f"✅ Queued task {task.id} for: {doc_data['filename']}")
+    # Publish all tasks in one pipelined broker round-trip
+    try:
+        group_result = group(signatures).apply_async()
+
+        for assigned, task in zip(assignments, group_result.children):
+            for doc_data in assigned:
+                task_info.append({
+                    "document_id": doc_data["document_id"],
+                    "filename": doc_data["filename"],
+                    "task_id": task.id,
+                    "status": "queued"
+                })
+
+        logger.info(
+            f"✅ Queued {len(solo)} single and {len(batches)} batch tasks "
+            f"for {len(documents_data)} documents (group {group_result.id})"
+        )
 
-        except Exception as e:
-            logger.error(f"❌ Failed to queue {doc_data['filename']}: {str(e)}")
+    except Exception as e:
+        logger.error(f"❌ Failed to queue document batches: {str(e)}")
+        for doc_data in documents_data:
             task_info.append({
                 "document_id": doc_data.get("document_id"),
                 "filename": doc_data.get("filename"),
@@ -78,12 +217,9 @@ def process_document_ids_task(
     }
 
 
-@celery_app.task(bind=True)
-def process_single_document_task(
-    self,
+def _process_stored_document(
     document_id: str,
     file_key: str,
-    content_b64: str,
     filename: str,
     content_type: str,
     folder_name: str,
@@ -91,13 +227,11 @@ def process_single_document_task(
     organization_id: str = None
 ) -> Dict[str, Any]:
     """
-    Worker task - processes ONE document
+    Download one already-uploaded document and run the ingestion pipeline on it
 
     Args:
-        self: Celery task instance
         document_id: MongoDB document ID (already created with status="processing")
-        file_key: iDrive E2 file path (organization_id/folder/document_id.ext)
-        content_b64: Base64-encoded file content
+        file_key: iDrive E2 file path (organization_id/folder/document_id.ext), already uploaded
         filename: Original filename
         content_type: MIME type
         folder_name: Folder name
@@ -105,17 +239,16 @@ def process_single_document_task(
         organization_id: Organization ID
 
     Returns:
-        Processing result
+        Processing result (status "error" instead of raising)
     """
-    ingestion_service = None
     try:
         logger.info(f"🚀 Worker processing: {filename} (doc_id: {document_id})")
 
-        # Decode base64 file content
-        file_content = base64.b64decode(content_b64)
+        # Reuse the worker's shared ingestion service
+        ingestion_service = _get_ingestion_service()
 
-        # Create ingestion service
-        ingestion_service = IngestionService()
+        # Fetch file content uploaded by the upload endpoint
+        file_content = ingestion_service.idrivee2_client.download_file_sync(file_key)
 
         # Use fully synchronous method - no event loop needed
         result = ingestion_service.process_single_document_sync(
@@ -127,7 +260,8 @@ def process_single_document_task(
             folder_name=folder_name,
             user_id=user_id,
             organization_id=organization_id,
-            additional_metadata=None
+            additional_metadata=None,
+            file_already_uploaded=True
         )
 
         logger.info(f"✅ Worker completed: {filename}")
@@ -138,38 +272,116 @@ def process_single_document_task(
             "result": result
         }
 
+    except SoftTimeLimitExceeded:
+        logger.error(f"❌ Worker hit the time limit on {filename}")
+        _mark_documents_failed([{"document_id": document_id}], "Task time limit exceeded")
+        raise
+
     except Exception as e:
         logger.error(f"❌ Worker failed {filename}: {str(e)}", exc_info=True)
+        # Covers failures before the ingestion pipeline runs (e.g. the E2 download),
+        # which would otherwise leave the document in "processing"
+        _mark_documents_failed([{"document_id": document_id}], str(e))
         return {
             "status": "error",
             "document_id": document_id,
             "filename": filename,
             "error": str(e)
         }
-    finally:
-        # CRITICAL: Clean up all client resources and thread pools after EACH task
-        if ingestion_service:
-            try:
-                ingestion_service.cleanup()
-                logger.info(f"🧹 Cleaned up resources for: {filename}")
-            except Exception as cleanup_error:
-                logger.warning(f"Cleanup warning for {filename}: {str(cleanup_error)}")
-
-        # Clean up Unstructured client (singleton with httpx)
+
+
+@celery_app.task(bind=True, queue="docs")
+def process_document_batch_task(
+    self,
+    documents: List[Dict[str, Any]],
+    folder_name: str,
+    user_id: str = None,
+    organization_id: str = None
+) -> Dict[str, Any]:
+    """
+    Worker task - processes a sub-batch of documents with one shared service,
+    paying task setup/teardown once per batch instead of once per document
+
+    Args:
+        self: Celery task instance
+        documents: List of dicts with document_id, file_key, filename, content_type
+        folder_name: Folder name
+        user_id: User ID
+        organization_id: Organization ID
+
+    Returns:
+        Per-document processing results
+    """
+    logger.info(f"🚀 Worker processing batch of {len(documents)} documents")
+
+    results = []
+    for index, doc_data in enumerate(documents):
         try:
-            from clients.unstructured_client import UnstructuredClient
-            unstructured_client = UnstructuredClient()
-            if hasattr(unstructured_client, 'cleanup'):
-                unstructured_client.cleanup()
-        except Exception as e:
-            logger.warning(f"Unstructured cleanup warning: {str(e)}")
+            results.append(_process_stored_document(
+                document_id=doc_data["document_id"],
+                file_key=doc_data["file_key"],
+                filename=doc_data["filename"],
+                content_type=doc_data["content_type"],
+                folder_name=folder_name,
+                user_id=user_id,
+                organization_id=organization_id
+            ))
+        except SoftTimeLimitExceeded:
+            # Don't leave the rest of the batch in "processing" once the task is cut short
+            _mark_documents_failed(documents[index + 1:], "Batch task time limit exceeded")
+            raise
+
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    logger.info(f"✅ Batch completed: {succeeded}/{len(documents)} documents succeeded")
+    return {
+        "status": "success",
+        "total": len(documents),
+        "succeeded": succeeded,
+        "results": results
+    }
 
-        # Force garbage collection to clean up any lingering thread pools
-        gc.collect()
-        logger.info(f"🗑️ Forced garbage collection after: {filename}")
 
+@celery_app.task(bind=True, queue="docs")
+def process_single_document_task(
+    self,
+    document_id: str,
+    file_key: str,
+    filename: str,
+    content_type: str,
+    folder_name: str,
+    user_id: str = None,
+    organization_id: str = None
+) -> Dict[str, Any]:
+    """
+    Worker task - processes ONE document
+
+    Args:
+        self: Celery task instance
+        document_id: MongoDB document ID (already created with status="processing")
+        file_key: iDrive E2 file path (organization_id/folder/document_id.ext), already uploaded
+        filename: Original filename
+        content_type: MIME type
+        folder_name: Folder name
+        user_id: User ID
+        organization_id: Organization ID
 
-@celery_app.task(bind=True)
+    Returns:
+        Processing result
+    """
+    # Shared service clients (incl. Unstructured) stay open across tasks and are
+    # closed on worker shutdown
+    return _process_stored_document(
+        document_id=document_id,
+        file_key=file_key,
+        filename=filename,
+        content_type=content_type,
+        folder_name=folder_name,
+        user_id=user_id,
+        organization_id=organization_id
+    )
+
+
+@celery_app.task(bind=True, queue="youtube", rate_limit="30/m")
 def process_youtube_document_task(
     self,
     document_id: str,
@@ -194,10 +406,7 @@ def process_youtube_document_task(
     """
     from clients.youtube_downloader import YouTubeDownloader
     from clients.mongodb_client import get_mongodb_client
-    from bson import ObjectId
-    from datetime import datetime
 
-    ingestion_service = None
     temp_file_path = None
 
     try:
@@ -214,53 +423,57 @@ def process_youtube_document_task(
         file_size_mb = len(video_bytes) / (1024 * 1024)
 
         # 3. Build file_key using document_id and extension from downloaded filename
-        from utils.file_utils import get_file_extension
         extension = get_file_extension(actual_filename)
         if organization_id:
             file_key = f"{organization_id}/{folder_name}/{document_id}{extension}"
         else:
             file_key = f"{folder_name}/{document_id}{extension}"
 
-        # Update document with actual filename, file_key, and metadata
+        # Update document with actual filename, file_key, and metadata in the
+        # background so ingestion does not wait on the MongoDB round-trip
         mongodb = get_mongodb_client()
 
-        mongodb.update_document(
-            collection="documents",
-            query={"_id": ObjectId(document_id)},
-            update={
-                "file_name": actual_filename,
-                "file_key": file_key,
-                "file_size_mb": file_size_mb,
-                "additional_metadata": {
-                    "source": "youtube",
-                    "youtube_url": youtube_url,
-                    "youtube_video_id": metadata.get("video_id"),
-                    "youtube_title": metadata.get("title"),
-                    "youtube_uploader": metadata.get("uploader"),
-                    "youtube_duration": metadata.get("duration"),
-                    "youtube_upload_date": metadata.get("upload_date"),
-                    "youtube_description": metadata.get("description"),
-                },
-                "updated_at": datetime.utcnow()
-            }
-        )
+        with ThreadPoolExecutor(max_workers=1) as metadata_executor:
+            metadata_update = metadata_executor.submit(
+                mongodb.update_document,
+                collection="documents",
+                query={"_id": ObjectId(document_id)},
+                update={
+                    "file_name": actual_filename,
+                    "file_key": file_key,
+                    "file_size_mb": file_size_mb,
+                    "additional_metadata": {
+                        "source": "youtube",
+                        "youtube_url": youtube_url,
+                        "youtube_video_id": metadata.get("video_id"),
+                        "youtube_title": metadata.get("title"),
+                        "youtube_uploader": metadata.get("uploader"),
+                        "youtube_duration": metadata.get("duration"),
+                        "youtube_upload_date": metadata.get("upload_date"),
+                        "youtube_description": metadata.get("description"),
+                    },
+                    "updated_at": datetime.utcnow()
+                }
+            )
 
-        logger.info(f"📝 Updated document with actual filename: {actual_filename}")
+            # 4. Process the video using existing pipeline (shared worker service)
+            ingestion_service = _get_ingestion_service()
 
-        # 4. Process the video using existing pipeline
-        ingestion_service = IngestionService()
+            result = ingestion_service.process_single_document_sync(
+                document_id=document_id,
+                file_key=file_key,
+                file_content=video_bytes,
+                filename=actual_filename,
+                content_type="video/mp4",
+                folder_name=folder_name,
+                user_id=user_id,
+                organization_id=organization_id,
+                additional_metadata=None  # Written by the metadata update above
+            )
 
-        result = ingestion_service.process_single_document_sync(
-            document_id=document_id,
-            file_key=file_key,
-            file_content=video_bytes,
-            filename=actual_filename,
-            content_type="video/mp4",
-            folder_name=folder_name,
-            user_id=user_id,
-            organization_id=organization_id,
-            additional_metadata=None  # Already updated above
-        )
+            # Make sure the metadata write landed before reporting the result
+            metadata_update.result(timeout=30)
+            logger.info(f"📝 Updated document with actual filename: {actual_filename}")
 
         logger.info(f"✅ Worker completed: {actual_filename}")
         return {
@@ -278,24 +491,3 @@ def process_youtube_document_task(
             "youtube_url": youtube_url,
             "error": str(e)
         }
-    finally:
-        # CRITICAL: Clean up all client resources
-        if ingestion_service:
-            try:
-                ingestion_service.cleanup()
-                logger.info(f"🧹 Cleaned up resources for YouTube video")
-            except Exception as cleanup_error:
-                logger.warning(f"Cleanup warning: {str(cleanup_error)}")
-
-        # Clean up Unstructured client
-        try:
-            from clients.unstructured_client import UnstructuredClient
-            unstructured_client = UnstructuredClient()
-            if hasattr(unstructured_client, 'cleanup'):
-                unstructured_client.cleanup()
-        except Exception as e:
-            logger.warning(f"Unstructured cleanup warning: {str(e)}")
-
-        # Force garbage collection
-        gc.collect()
-        logger.info(f"🗑️ Forced garbage collection after YouTube video")
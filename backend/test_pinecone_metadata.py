@@ -53,11 +53,17 @@ def test_pinecone_metadata():
         logger.info("📊 CHUNK METADATA SAMPLES")
         logger.info("=" * 80)
 
+        # Count file key coverage in the same pass as the display loop
+        file_key_count = 0
+        keyframe_key_count = 0
+
         for idx, (document, score) in enumerate(results, 1):
             logger.info(f"\n[Chunk {idx}]")
             logger.info(f"   Score: {score:.4f}")
 
             metadata = document.metadata
+            file_key_count += bool(metadata.get('file_key'))
+            keyframe_key_count += bool(metadata.get('keyframe_file_key'))
 
             # Check for file_key fields
             logger.info(f"\n   📁 File Keys:")
@@ -90,9 +96,6 @@ def test_pinecone_metadata():
         logger.info("📊 VERIFICATION SUMMARY")
         logger.info("=" * 80)
 
-        file_key_count = sum(1 for doc, _ in results if doc.metadata.get('file_key'))
-        keyframe_key_count = sum(1 for doc, _ in results if doc.metadata.get('keyframe_file_key'))
-
         logger.info(f"\n✅ Total chunks queried: {len(results)}")
         logger.info(f"✅ Chunks with file_key: {file_key_count}/{len(results)}")
         logger.info(f"✅ Chunks with keyframe_file_key: {keyframe_key_count}/{len(results)}")
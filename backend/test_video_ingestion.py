@@ -16,7 +16,6 @@ sys.path.insert(0, str(Path(__file__).parent))
 from app.logger import logger
 from services.ingestion_service import get_ingestion_service
 from fastapi import UploadFile
-import io
 
 
 async def test_video_ingestion(video_path: str, folder_name: str = "test_videos") -> Dict[str, Any]:
@@ -37,6 +36,7 @@ async def test_video_ingestion(video_path: str, folder_name: str = "test_videos"
     logger.info(f"📁 Folder: {folder_name}")
 
     start_time = time.time()
+    upload_file = None
 
     try:
         # Read video file
@@ -46,17 +46,14 @@ async def test_video_ingestion(video_path: str, folder_name: str = "test_videos"
         if not video_path_obj.exists():
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
-        with open(video_path, 'rb') as f:
-            file_content = f.read()
+        file_size_mb = video_path_obj.stat().st_size / (1024 * 1024)
+        logger.info(f"✅ Video file found: {file_size_mb:.2f} MB")
 
-        file_size_mb = len(file_content) / (1024 * 1024)
-        logger.info(f"✅ Video file read: {file_size_mb:.2f} MB")
-
-        # Create UploadFile object
+        # Create UploadFile object over the open file handle (no in-memory copy)
         logger.info("📦 Creating UploadFile object...")
         upload_file = UploadFile(
             filename=video_path_obj.name,
-            file=io.BytesIO(file_content)
+            file=open(video_path, 'rb')
         )
 
         # Get ingestion service
@@ -123,6 +120,9 @@ async def test_video_ingestion(video_path: str, folder_name: str = "test_videos"
         logger.error("=" * 80)
         logger.error(f"Error: {str(e)}", exc_info=True)
         raise
+    finally:
+        if upload_file:
+            upload_file.file.close()
 
 
 async def test_with_timeout(video_path: str, timeout_seconds: int = 300):
@@ -3,12 +3,155 @@ Agno Tools for Knowledge Management
 Creates custom tools for agno agent
 """
 
+import asyncio
 from typing import List, Dict, Any, Optional
 from agno.agent import Agent
 from clients.pinecone_client import get_pinecone_client
 from app.logger import logger
 
 
+class _QueryBatcher:
+    """
+    Micro-batches concurrent knowledge base searches
+
+    Searches arriving within a short window (e.g. parallel tool calls in one
+    agent step) share a single embedding request; their Pinecone queries are
+    then issued concurrently and results are scattered back to each caller.
+    """
+
+    MAX_BATCH_SIZE = 8
+    MAX_WAIT_SECONDS = 0.01
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(
+        self,
+        query: str,
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Queue a search and wait for its results
+
+        Args:
+            query: Query text
+            k: Number of results to return
+            filter: Optional metadata filter
+            namespace: Optional namespace (organization_id)
+
+        Returns:
+            List[tuple]: List of (Document, score) tuples
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        await self._queue.put((query, k, filter, namespace, future))
+        return await future
+
+    async def _run(self):
+        """Collect up to MAX_BATCH_SIZE searches or MAX_WAIT_SECONDS, then flush"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.MAX_WAIT_SECONDS
+            while len(batch) < self.MAX_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(remaining):
+                        batch.append(await self._queue.get())
+                except TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[tuple]):
+        """Embed all queries in one request, then run the Pinecone queries concurrently"""
+        try:
+            pinecone_client = get_pinecone_client()
+            embeddings = await pinecone_client.embeddings.aembed_documents([item[0] for item in batch])
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(batch) > 1:
+            logger.info(f"🔍 Batched {len(batch)} knowledge base searches into one embedding request")
+
+        results = await asyncio.gather(*(
+            asyncio.to_thread(
+                pinecone_client.similarity_search_by_vector_with_score,
+                embedding=embedding,
+                k=k,
+                filter=filter,
+                namespace=namespace
+            )
+            for (_, k, filter, namespace, _), embedding in zip(batch, embeddings)
+        ), return_exceptions=True)
+
+        for (*_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_query_batcher = _QueryBatcher()
+
+
+def _format_result(doc: Any, score: float) -> Dict[str, Any]:
+    """
+    Format one Pinecone search hit as a knowledge base result
+
+    Args:
+        doc: LangChain document with page_content and metadata
+        score: Similarity score
+
+    Returns:
+        Dict[str, Any]: Result with text, file_id, datasource and metadata
+    """
+    metadata = doc.metadata
+    get = metadata.get
+
+    result = {
+        "text": doc.page_content,
+        "file_id": get("document_id", ""),
+        "datasource": "files",  # Default to files
+        "metadata": {
+            "file_name": get("file_name", "Unknown"),
+            "folder_name": get("folder_name", "N/A"),
+            "score": score,
+            "file_key": get("file_key", ""),  # S3 object key
+        }
+    }
+
+    # Video fields are only read for video chunks
+    if "video_id" in metadata:
+        result["datasource"] = "videos"
+        result["metadata"].update({
+            "video_id": get("video_id"),
+            "video_name": get("video_name"),
+            "clip_start": get("clip_start"),
+            "clip_end": get("clip_end"),
+            "scene_id": get("scene_id"),
+            "key_frame_timestamp": get("key_frame_timestamp"),
+            "keyframe_file_key": get("keyframe_file_key", ""),  # Thumbnail S3 key
+        })
+
+    return result
+
+
 def create_knowledge_retriever(
     organization_id: Optional[str] = None,
     user_id: Optional[str] = None,
@@ -30,7 +173,18 @@ def create_knowledge_retriever(
     # Store default in closure
     num_documents_default = num_documents
 
-    def search_knowledge_base(
+    # Build filter for RBAC and document filtering once - it is fixed per retriever
+    filter_dict = {}
+    if user_id:
+        filter_dict["user_id"] = user_id
+    if document_ids:
+        filter_dict["document_id"] = {"$in": list(document_ids)}
+    filter_dict = filter_dict or None
+
+    # If document_ids is explicitly provided but empty, every search returns no results
+    no_documents_selected = document_ids is not None and len(document_ids) == 0
+
+    async def search_knowledge_base(
         query: str,
         agent: Optional[Agent] = None,
         num_documents: Optional[int] = None
@@ -55,36 +209,22 @@ def create_knowledge_retriever(
         if num_documents is None:
             num_documents = num_documents_default
 
+        if no_documents_selected:
+            logger.info("No documents selected - returning empty results")
+            return None
+
         try:
             logger.info(
                 f"🔍 Searching knowledge base: '{query}' "
                 f"(limit: {num_documents}, docs: {len(document_ids) if document_ids else 'all'})"
             )
 
-            # Get Pinecone client
-            pinecone_client = get_pinecone_client()
-
-            # Build filter for RBAC and document filtering
-            filter_dict = {}
-            if user_id:
-                filter_dict["user_id"] = user_id
-
-            # Add document_ids filter if provided
-            # If document_ids is explicitly provided but empty, return no results
-            if document_ids is not None:
-                if len(document_ids) == 0:
-                    logger.info("No documents selected - returning empty results")
-                    return None
-                else:
-                    filter_dict["document_id"] = {"$in": document_ids}
-                    logger.debug(f"Filtering by document_ids: {document_ids}")
-
-            # Query Pinecone with scores
-            results = pinecone_client.similarity_search_with_score(
+            # Query Pinecone with scores (batched with concurrent searches)
+            results = await _query_batcher.submit(
                 query=query,
                 k=num_documents,
-                namespace=organization_id,
-                filter=filter_dict if filter_dict else None
+                filter=filter_dict,
+                namespace=organization_id
             )
 
             if not results:
@@ -92,37 +232,7 @@ def create_knowledge_retriever(
                 return None
 
             # Format results as list of dicts
-            documents = []
-            for doc, score in results:
-                metadata = doc.metadata
-
-                # Create document dict
-                doc_dict = {
-                    "text": doc.page_content,
-                    "file_id": metadata.get("document_id", ""),
-                    "datasource": "files",  # Default to files
-                    "metadata": {
-                        "file_name": metadata.get("file_name", "Unknown"),
-                        "folder_name": metadata.get("folder_name", "N/A"),
-                        "score": score,
-                        "file_key": metadata.get("file_key", ""),  # S3 object key
-                    }
-                }
-
-                # Check if this is a video chunk
-                if "video_id" in metadata:
-                    doc_dict["datasource"] = "videos"
-                    doc_dict["metadata"].update({
-                        "video_id": metadata.get("video_id"),
-                        "video_name": metadata.get("video_name"),
-                        "clip_start": metadata.get("clip_start"),
-                        "clip_end": metadata.get("clip_end"),
-                        "scene_id": metadata.get("scene_id"),
-                        "key_frame_timestamp": metadata.get("key_frame_timestamp"),
-                        "keyframe_file_key": metadata.get("keyframe_file_key", ""),  # Thumbnail S3 key
-                    })
-
-                documents.append(doc_dict)
+            documents = [_format_result(doc, score) for doc, score in results]
 
             # Create summary as first item
 
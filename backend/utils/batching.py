@@ -0,0 +1,141 @@
+"""
+Batching Utilities
+Groups documents into mini-batches for batched LLM prompts and runs the
+MAP-phase summarization shared by the podcast and report pipelines
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Tuple
+from app.logger import logger
+
+# MAP phase batching (documents per LLM call, combined content budget, parallel calls)
+MAP_BATCH_SIZE = 6
+MAP_BATCH_MAX_CHARS = 40000
+MAP_CONCURRENCY = 5
+
+
+def batch_documents(
+    documents: List[Dict[str, Any]],
+    max_batch_size: int = MAP_BATCH_SIZE,
+    max_chars: int = MAP_BATCH_MAX_CHARS,
+    content_field: str = "raw_content"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Group documents into batches bounded by document count and content size
+
+    A document whose content alone exceeds max_chars is placed in its own batch.
+
+    Args:
+        documents: Documents to group (order is preserved)
+        max_batch_size: Maximum number of documents per batch
+        max_chars: Character budget for the combined content of a batch
+        content_field: Document field holding the text content
+
+    Returns:
+        List of document batches
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_chars = 0
+
+    for doc in documents:
+        size = len(doc.get(content_field) or "")
+        if current and (len(current) >= max_batch_size or current_chars + size > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(doc)
+        current_chars += size
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+async def summarize_documents(
+    documents: List[Dict[str, Any]],
+    summary_cache: Any,
+    summary_llm: Any,
+    build_summary_prompt: Callable[[Dict[str, Any]], Any],
+    parse_summary: Callable[[Any], Any],
+    batch_summary_llm: Any,
+    build_batch_summary_prompt: Callable[[List[Dict[str, Any]]], Any],
+    parse_batch_summary: Callable[[Any], Any],
+    max_concurrency: int = MAP_CONCURRENCY
+) -> Tuple[Dict[str, Any], List[asyncio.Task]]:
+    """
+    MAP phase: summarize documents, batching several per LLM call
+
+    Cached summaries are reused. Misses are grouped with batch_documents; each
+    multi-document batch goes to batch_summary_llm, whose result must have a
+    `summaries` list with one item per <doc> id, and single documents go to
+    summary_llm. All calls share one concurrency bound and run together. A
+    batch that fails or returns the wrong ids immediately queues one
+    summary_llm call per document. Summaries are written to the cache in the
+    background as they arrive.
+
+    Args:
+        documents: MongoDB documents with _id and raw_content
+        summary_cache: SummaryCache for the caller's MAP prompt version
+        summary_llm: Runnable used for single-document prompts
+        build_summary_prompt: Builds the prompt for one document
+        parse_summary: Converts a summary_llm result into the summary to store
+        batch_summary_llm: Structured-output runnable used for batched prompts
+        build_batch_summary_prompt: Builds the prompt for a batch (doc ids are list indexes)
+        parse_batch_summary: Converts one item of the batch result into the summary to store
+        max_concurrency: Maximum parallel LLM calls
+
+    Returns:
+        Tuple of (dict mapping document_id to summary, pending cache-write tasks).
+        Documents that failed are absent; await the tasks once the summaries
+        have been used (e.g. after REDUCE) so the writes stay off the critical path.
+    """
+    summaries = await summary_cache.get_many(documents)
+    to_summarize = [doc for doc in documents if str(doc["_id"]) not in summaries]
+
+    batches = batch_documents(to_summarize)
+    logger.info(
+        f"⏳ Summarizing {len(to_summarize)} documents in {len(batches)} batches "
+        f"(concurrency: {max_concurrency}, cached: {len(summaries)})"
+    )
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    cache_writes: List[asyncio.Task] = []
+
+    def store(doc: Dict[str, Any], summary: Any):
+        if not summary:
+            return
+        summaries[str(doc["_id"])] = summary
+        cache_writes.append(asyncio.create_task(summary_cache.set(doc, summary)))
+
+    async def summarize_single(doc: Dict[str, Any]):
+        try:
+            async with semaphore:
+                result = await summary_llm.ainvoke(build_summary_prompt(doc))
+        except Exception as e:
+            logger.error(f"❌ Failed to summarize document {doc.get('filename', doc['_id'])}: {str(e)}")
+            return
+        store(doc, parse_summary(result))
+        logger.info(f"✅ Summarized document: {doc.get('filename', 'Unknown')}")
+
+    async def summarize_batch(batch: List[Dict[str, Any]]):
+        try:
+            async with semaphore:
+                result = await batch_summary_llm.ainvoke(build_batch_summary_prompt(batch))
+            by_id = {item.id: item for item in result.summaries}
+            if sorted(by_id) != list(range(len(batch))):
+                raise ValueError(f"batch returned {len(by_id)} summaries for {len(batch)} documents")
+        except Exception as e:
+            logger.warning(f"⚠️ Batch summarization failed, falling back to per-document summaries: {str(e)}")
+            await asyncio.gather(*(summarize_single(doc) for doc in batch))
+            return
+        logger.info(f"✅ Summarized batch of {len(batch)} documents")
+        for i, doc in enumerate(batch):
+            store(doc, parse_batch_summary(by_id[i]))
+
+    await asyncio.gather(*(
+        summarize_single(batch[0]) if len(batch) == 1 else summarize_batch(batch)
+        for batch in batches
+    ))
+    return summaries, cache_writes
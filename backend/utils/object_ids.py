@@ -0,0 +1,30 @@
+"""
+ObjectId Utilities
+Normalizes client-supplied document ID lists before they reach MongoDB
+"""
+
+from typing import List
+from bson import ObjectId
+from app.logger import logger
+
+
+def unique_object_ids(document_ids: List[str]) -> List[ObjectId]:
+    """
+    Validate, convert and dedupe document IDs in one pass
+
+    Invalid and duplicate IDs are dropped (first occurrence wins, order is
+    preserved) so they never cause extra lookups or repeated LLM calls.
+
+    Args:
+        document_ids: Document ID strings as received from the client
+
+    Returns:
+        List of unique ObjectIds in request order
+    """
+    unique_oids = list(dict.fromkeys(ObjectId(d) for d in document_ids if ObjectId.is_valid(d)))
+
+    dropped = len(document_ids) - len(unique_oids)
+    if dropped:
+        logger.warning(f"⚠️ Dropped {dropped} invalid or duplicate document IDs ({len(unique_oids)} remaining)")
+
+    return unique_oids
@@ -6,12 +6,77 @@ SSE (Server-Sent Events) streaming helpers
 import asyncio
 import json
 from contextlib import suppress
-from typing import Any, AsyncIterator, Dict
+from typing import Any, AsyncIterator, Dict, Optional
+
+import orjson
+
+# Max upstream events buffered ahead of the SSE consumer
+STREAM_QUEUE_SIZE = 64
+
+# Marks normal end of the upstream event iterator
+_STREAM_END = object()
+
+# Pre-encoded SSE frames/field prefixes (responses stream bytes, no per-event str encode)
+_KEEPALIVE_FRAME = b": keepalive\n\n"
+_DONE_FRAME = b"data: [DONE]\n\n"
+_ID_PREFIX = b"id: "
+_EVENT_PREFIX = b"event: "
+_DATA_PREFIX = b"\ndata: "
+_FRAME_END = b"\n\n"
+
+
+def _dumps_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize an event payload to UTF-8 JSON bytes
+
+    Args:
+        payload: Event data (non-JSON types are stringified)
+
+    Returns:
+        bytes: JSON payload
+    """
+    try:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    except (orjson.JSONEncodeError, TypeError):
+        # orjson rejects some values stdlib json accepts (e.g. ints beyond 64 bits)
+        return json.dumps(payload, ensure_ascii=False, default=str).encode()
+
+
+def _encode_sse_frame(event_name: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    """
+    Build one SSE frame as bytes in a single join
+
+    Args:
+        event_name: SSE event name
+        data: Serialized JSON payload
+        event_id: Optional sequential event ID
+
+    Returns:
+        bytes: UTF-8 encoded SSE frame
+    """
+    parts = [_EVENT_PREFIX, event_name.encode(), _DATA_PREFIX, data, _FRAME_END]
+    if event_id is not None:
+        parts[:0] = (_ID_PREFIX, str(event_id).encode(), b"\n")
+    return b"".join(parts)
+
+
+def format_sse_event(event: str, payload: Dict[str, Any]) -> bytes:
+    """
+    Format a single named SSE frame with a JSON payload
+
+    Args:
+        event: SSE event name
+        payload: JSON-serializable event data
+
+    Returns:
+        bytes: UTF-8 encoded SSE frame
+    """
+    return _encode_sse_frame(event, _dumps_payload(payload))
 
 
 def create_sse_event_stream(
     events: AsyncIterator[Dict[str, Any]],
-) -> AsyncIterator[str]:
+) -> AsyncIterator[bytes]:
     """
     Convert structured events into SSE frames with keepalive heartbeats
 
@@ -19,53 +84,62 @@ def create_sse_event_stream(
         events: Async iterator of event dictionaries
 
     Yields:
-        str: SSE formatted strings
+        bytes: UTF-8 encoded SSE frames
     """
 
     async def _run():
-        iterator = events.__aiter__()
-        pending = asyncio.create_task(iterator.__anext__())
+        # One producer task drains the upstream iterator into a bounded queue
+        # (backpressure on slow clients) instead of one task per event
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
         event_id = 0
         keepalive_interval = 300  # seconds
 
+        async def _producer():
+            try:
+                async for event in events:
+                    await queue.put(event)
+            except Exception as exc:
+                await queue.put(exc)
+            else:
+                await queue.put(_STREAM_END)
+
+        producer = asyncio.create_task(_producer())
+
         try:
             while True:
                 try:
                     # Wait for next event with timeout for keepalive
-                    event = await asyncio.wait_for(pending, timeout=keepalive_interval)
-                except asyncio.TimeoutError:
+                    async with asyncio.timeout(keepalive_interval):
+                        item = await queue.get()
+                except TimeoutError:
                     # Send keepalive comment to maintain connection
-                    yield ": keepalive\n\n"
+                    yield _KEEPALIVE_FRAME
                     # Continue waiting for the actual event
                     continue
-                except StopAsyncIteration:
-                    yield "data: [DONE]\n\n"
+
+                if item is _STREAM_END:
+                    yield _DONE_FRAME
                     break
-                except Exception as exc:
-                    event_id += 1
+
+                event_id += 1
+                if isinstance(item, Exception):
                     fallback = {
                         "event": "error",
-                        "error": str(exc),
+                        "error": str(item),
                         "error_type": "StreamingError",
                     }
-                    data = json.dumps(fallback, ensure_ascii=False, default=str)
-                    yield f"id: {event_id}\nevent: error\ndata: {data}\n\n"
-                    yield "data: [DONE]\n\n"
+                    yield _encode_sse_frame("error", _dumps_payload(fallback), event_id)
+                    yield _DONE_FRAME
                     break
-                else:
-                    event_id += 1
-                    payload = {k: v for k, v in event.items() if k != "event"}
-                    data = json.dumps(payload, ensure_ascii=False, default=str)
-                    event_name = event.get("event", "message.delta")
-                    yield f"id: {event_id}\nevent: {event_name}\ndata: {data}\n\n"
-                    pending = asyncio.create_task(iterator.__anext__())
+
+                payload = {k: v for k, v in item.items() if k != "event"}
+                data = _dumps_payload(payload)
+                event_name = item.get("event", "message.delta")
+                yield _encode_sse_frame(event_name, data, event_id)
         finally:
-            if not pending.done():
-                pending.cancel()
-                with suppress(asyncio.CancelledError):
-                    await pending
-            else:
-                with suppress(asyncio.CancelledError, StopAsyncIteration):
-                    pending.result()
+            if not producer.done():
+                producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
 
     return _run()
@@ -10,6 +10,7 @@ Single tool, single turn example.
 Run with: uv run slm.py
 """
 
+import functools
 import json
 
 from rich import print
@@ -19,6 +20,7 @@ from ollama import chat
 model = 'functiongemma'
 
 
+@functools.lru_cache(maxsize=128)
 def get_weather(city: str) -> str:
   """
   Get the current weather for a city.
@@ -29,7 +31,7 @@ def get_weather(city: str) -> str:
   Returns:
     A string describing the weather
   """
-  return json.dumps({'city': city, 'temperature': 22, 'unit': 'celsius', 'condition': 'sunny'})
+  return json.dumps({'city': city, 'temperature': 22, 'unit': 'celsius', 'condition': 'sunny'}, separators=(',', ':'))
 
 
 messages = [{'role': 'user', 'content': 'Whats the temperature in Paris?'}]